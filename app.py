@@ -1,11 +1,23 @@
 import os
+import re
+import html
 import math
+import hashlib
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Callable, Mapping
 from databricks import sql
+from databricks.sql.client import Connection
 from databricks.sdk.core import Config
 import streamlit as st
-import pandas as pd
-from datetime import datetime, date
+import pyarrow as pa
+import pyarrow.compute as pc
+from datetime import datetime, date, timedelta
 from io import BytesIO
+from reportlab import rl_config
 from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
@@ -17,9 +29,6 @@ from reportlab.pdfgen import canvas
 # Ensure environment variable is set correctly
 assert os.getenv('DATABRICKS_WAREHOUSE_ID'), "DATABRICKS_WAREHOUSE_ID must be set in app.yaml."
 
-# Databricks config
-cfg = Config()
-
 # Schema definition for the client data table (search table)
 SCHEMA_SEARCH = {
     'koo_clientid': 'string',
@@ -58,123 +67,373 @@ SCHEMA_REPORT = {
 TABLE_NAME_SEARCH = "dev_structured.analytics.all_measures"
 TABLE_NAME_REPORT = "dev_structured.analytics.all_measures_with_ai"
 
+# Free-text response columns are only previewed in the search grid, so they are truncated
+# in the query instead of sending every matching row's full text over the wire
+SEARCH_RESPONSE_COLUMNS = ('response_house', 'response_impa', 'response_mmh')
+SEARCH_RESPONSE_PREVIEW_CHARS = 80
 
-def sql_query_with_service_principal(query: str) -> pd.DataFrame:
-    """Execute a SQL query and return the result as a pandas DataFrame."""
-    with sql.connect(
-        server_hostname=cfg.host,
-        http_path=f"/sql/1.0/warehouses/{cfg.warehouse_id}",
-        credentials_provider=lambda: cfg.authenticate
-    ) as connection:
-        with connection.cursor() as cursor:
-            cursor.execute(query)
-            return cursor.fetchall_arrow().to_pandas()
+# Projections are derived from the schemas above so each query only fetches what the UI uses:
+# the search grid never pulls the report summaries, which are loaded only for a selected client
+SEARCH_SELECT_LIST = ", ".join(
+    f"LEFT({col}, {SEARCH_RESPONSE_PREVIEW_CHARS}) AS {col}" if col in SEARCH_RESPONSE_COLUMNS else col
+    for col in SCHEMA_SEARCH
+)
+REPORT_SELECT_LIST = ", ".join(SCHEMA_REPORT)
+
+# Arrow schema of a search result, used for an empty result when the search cannot run
+SEARCH_ARROW_SCHEMA = pa.schema([
+    (col, pa.date32() if col_type == 'date' else pa.string())
+    for col, col_type in SCHEMA_SEARCH.items()
+])
+
+# A complete NHI number in the old (AAANNNN) or new (AAANNAA) format
+NHI_PATTERN = re.compile(r"[A-Za-z]{3}\d{2}(?:\d{2}|[A-Za-z]{2})")
+
+# Maximum number of open warehouse connections per credential; queries beyond this wait for a free one
+CONNECTION_POOL_SIZE = 4
+
+# Maximum number of search results shown per page
+SEARCH_PAGE_SIZE = 200
+
+# How long a search result is reused, both from the query cache and when narrowed locally
+SEARCH_CACHE_TTL_SECONDS = 300
+
+# Search result columns shown in the results grid, in display order
+SEARCH_DISPLAY_COLUMNS = {
+    'client_name': 'Client Name',
+    'client_nhi': 'Client NHI',
+    'response_house': 'Response House',
+    'response_impa': 'Response Impa',
+    'response_mmh': 'Response MMH',
+    'createdon': 'Create Date'
+}
+
+
+@dataclass
+class ConnectionPool:
+    """
+    A bounded pool of Databricks SQL connections shared across reruns.
+    Connections are opened on demand, up to CONNECTION_POOL_SIZE, so concurrent
+    sessions run their queries in parallel instead of queueing on one connection.
+    """
+    connect: Callable[[], Connection]
+    slots: threading.BoundedSemaphore = field(default_factory=lambda: threading.BoundedSemaphore(CONNECTION_POOL_SIZE))
+    idle: list = field(default_factory=list)
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    closed: bool = False
+    
+    def acquire(self) -> Connection:
+        """Take an idle connection, or open a new one, waiting while the pool is at capacity."""
+        self.slots.acquire()
+        try:
+            with self.lock:
+                connection = self.idle.pop() if self.idle else None
+            return connection if connection is not None else self.connect()
+        except Exception:
+            self.slots.release()
+            raise
+    
+    def release(self, connection: Connection, broken: bool = False):
+        """Return a connection to the pool; broken connections, and any returned after close, are closed instead."""
+        with self.lock:
+            keep = not broken and not self.closed
+            if keep:
+                self.idle.append(connection)
+        if not keep:
+            close_quietly(connection)
+        self.slots.release()
+    
+    def close(self):
+        """Close every idle connection; connections still in use are closed when released."""
+        with self.lock:
+            self.closed = True
+            idle, self.idle = self.idle, []
+        for connection in idle:
+            close_quietly(connection)
+
+
+def close_quietly(connection: Connection):
+    """Close a connection, ignoring errors from already-dead sessions."""
+    try:
+        connection.close()
+    except Exception:
+        pass
+
+
+def close_connection_pool(pool: ConnectionPool):
+    """Close a connection pool when it is evicted from the cache."""
+    pool.close()
+
+
+@st.cache_resource(show_spinner=False)
+def get_config() -> Config:
+    """
+    Resolve the Databricks config once per process.
+    Module-level code re-runs on every Streamlit rerun, so the config is cached here instead.
+    """
+    return Config()
+
+
+@st.cache_resource(ttl=3600, max_entries=32, show_spinner=False, on_release=close_connection_pool)
+def get_connection_pool(host: str, warehouse_id: str, token_key: str, _user_token: str = None) -> ConnectionPool:
+    """
+    Create a pool of Databricks SQL connections and keep it cached for reuse.
+    Pools are keyed by (host, warehouse_id, token_key) so the raw token never
+    becomes a cache key, and expire after an hour so stale user tokens are not kept around.
+    At most 32 pools are kept, so open warehouse sessions stay bounded however many users sign in.
+    """
+    if _user_token:
+        connect = partial(
+            sql.connect,
+            server_hostname=host,
+            http_path=f"/sql/1.0/warehouses/{warehouse_id}",
+            access_token=_user_token
+        )
+    else:
+        # Service principal header factory, resolved once for this pool
+        auth_provider = get_config().authenticate
+        connect = partial(
+            sql.connect,
+            server_hostname=host,
+            http_path=f"/sql/1.0/warehouses/{warehouse_id}",
+            credentials_provider=lambda: auth_provider
+        )
+    return ConnectionPool(connect)
+
+
+def run_query_arrow(query: str, parameters: list = None, user_token: str = None) -> pa.Table:
+    """
+    Execute a SQL query on a pooled connection and return the result as an Arrow table.
+    Values for `?` parameter markers are passed in `parameters`.
+    If the connection has gone stale the pool is dropped and the query retried once
+    on a fresh connection. Results are cached by the st.cache_data callers, not here.
+    """
+    cfg = get_config()
+    connection_args = (cfg.host, cfg.warehouse_id, token_cache_key(user_token), user_token)
+    try:
+        return execute_arrow(get_connection_pool(*connection_args), query, parameters)
+    except sql.OperationalError:
+        get_connection_pool.clear(*connection_args)
+        return execute_arrow(get_connection_pool(*connection_args), query, parameters)
 
 
-def sql_query_with_user_token(query: str, user_token: str) -> pd.DataFrame:
-    """Execute a SQL query and return the result as a pandas DataFrame."""
-    with sql.connect(
-        server_hostname=cfg.host,
-        http_path=f"/sql/1.0/warehouses/{cfg.warehouse_id}",
-        access_token=user_token
-    ) as connection:
+def execute_arrow(pool: ConnectionPool, query: str, parameters: list = None) -> pa.Table:
+    """Run a query on a pooled connection and fetch the result as an Arrow table."""
+    connection = pool.acquire()
+    broken = False
+    try:
         with connection.cursor() as cursor:
-            cursor.execute(query)
-            return cursor.fetchall_arrow().to_pandas()
+            cursor.execute(query, parameters)
+            return cursor.fetchall_arrow()
+    except sql.OperationalError:
+        # The session is unusable, so it is closed rather than handed to the next query
+        broken = True
+        raise
+    finally:
+        pool.release(connection, broken)
+
+
+def row_to_dict(tbl: pa.Table, index: int = 0) -> dict:
+    """Return one row of an Arrow table as a dict of Python scalars, with None for nulls."""
+    return {name: tbl.column(name)[index].as_py() for name in tbl.schema.names}
+
 
+def token_cache_key(user_token: str = None) -> str:
+    """Return a digest of the user token for use in cache keys, so raw tokens are never stored."""
+    if not user_token:
+        return "sp"
+    return hashlib.sha256(user_token.encode()).hexdigest()
 
-def search_client_data(client_name: str = None, client_nhi: str = None, assessment_date: date = None, user_token: str = None) -> pd.DataFrame:
+
+@st.cache_data(ttl=SEARCH_CACHE_TTL_SECONDS, max_entries=128, show_spinner=False)
+def run_client_search(client_name: str, client_nhi: str, assessment_date: date, page: int, token_key: str, _user_token: str = None) -> pa.Table:
     """
-    Search client data from Databricks table with partial matching.
-    At least one search parameter must be provided.
-    Returns: pandas DataFrame with search results or empty DataFrame if not found.
+    Run the client search query for one page of results. Results are cached per
+    (criteria, page, token_key); the raw token is excluded from the cache key.
+    One row beyond the page size is fetched so callers can tell whether a next page exists.
+    The id columns break createdon ties so OFFSET paging sees a stable order.
     """
     conditions = []
+    parameters = []
     
-    if client_name and client_name.strip():
-        escaped_name = client_name.strip().replace("'", "''")
-        conditions.append(f"LOWER(client_name) LIKE LOWER('%{escaped_name}%')")
+    if client_name:
+        conditions.append("LOWER(client_name) LIKE LOWER(?)")
+        parameters.append(f"%{client_name}%")
     
-    if client_nhi and client_nhi.strip():
-        escaped_nhi = client_nhi.strip().replace("'", "''")
-        conditions.append(f"LOWER(client_nhi) LIKE LOWER('%{escaped_nhi}%')")
+    if client_nhi and NHI_PATTERN.fullmatch(client_nhi):
+        # A full NHI can only match itself, and a bare equality on the stored (upper-case)
+        # column lets Delta skip files on client_nhi stats instead of scanning the table
+        conditions.append("client_nhi = ?")
+        parameters.append(client_nhi.upper())
+    elif client_nhi:
+        conditions.append("LOWER(client_nhi) LIKE LOWER(?)")
+        parameters.append(f"%{client_nhi}%")
     
     if assessment_date:
-        date_str = assessment_date.strftime('%Y-%m-%d')
-        conditions.append(f"DATE(createdon) = '{date_str}'")
-    
-    if not conditions:
-        return pd.DataFrame()
+        # Half-open day range keeps createdon bare so Delta file skipping can use its min/max stats
+        conditions.append("createdon >= ? AND createdon < ?")
+        parameters.extend([assessment_date, assessment_date + timedelta(days=1)])
     
     where_clause = " AND ".join(conditions)
     
     query = f"""
-    SELECT 
-        koo_clientid,
-        koo_contactid,
-        client_name,
-        client_nhi,
-        createdon,
-        response_house,
-        response_impa,
-        response_mmh
+    SELECT {SEARCH_SELECT_LIST}
     FROM {TABLE_NAME_SEARCH}
     WHERE {where_clause}
-    ORDER BY createdon DESC
+    ORDER BY createdon DESC, koo_clientid, koo_contactid
+    LIMIT {SEARCH_PAGE_SIZE + 1} OFFSET {int(page) * SEARCH_PAGE_SIZE}
+    """
+    
+    return run_query_arrow(query, parameters, _user_token)
+
+
+def search_client_data(client_name: str = None, client_nhi: str = None, assessment_date: date = None, user_token: str = None, page: int = 0) -> pa.Table:
+    """
+    Search client data from Databricks table with partial matching.
+    At least one search parameter must be provided.
+    Returns: Arrow table with up to SEARCH_PAGE_SIZE + 1 rows for the requested page,
+    empty table if not found, or None if the query failed.
     """
+    client_name = client_name.strip() if client_name else ""
+    client_nhi = client_nhi.strip() if client_nhi else ""
+    
+    if not client_name and not client_nhi and not assessment_date:
+        return SEARCH_ARROW_SCHEMA.empty_table()
     
     try:
-        if user_token:
-            df = sql_query_with_user_token(query, user_token)
-        else:
-            df = sql_query_with_service_principal(query)
-        return df
+        return run_client_search(client_name, client_nhi, assessment_date, page, token_cache_key(user_token), user_token)
     except Exception as e:
         st.error(f"Error searching data: {str(e)}")
-        return pd.DataFrame()
+        return None
 
 
-def load_report_data(client_id: str, user_token: str = None) -> pd.DataFrame:
+def refine_search_results(tbl: pa.Table, previous: dict, criteria: dict) -> pa.Table:
     """
-    Load report data from Databricks table by koo_clientid.
-    Returns: pandas DataFrame with report data or empty DataFrame if not found.
+    Filter a complete earlier search result in Arrow when the new criteria only narrow it,
+    mirroring the case-insensitive substring match done in SQL.
+    Returns None when the new criteria need a fresh query, including when they do not
+    narrow the earlier search at all, so searching again always refreshes the results.
+    """
+    if previous.get('assessment_date') != criteria.get('assessment_date'):
+        return None
+    
+    mask = None
+    for col in ('client_name', 'client_nhi'):
+        old = (previous.get(col) or "").strip().lower()
+        new = (criteria.get(col) or "").strip().lower()
+        # LIKE wildcards in either value make substring containment meaningless
+        if old not in new or any(ch in old + new for ch in "%_"):
+            return None
+        if new != old:
+            if col == 'client_nhi' and NHI_PATTERN.fullmatch(new):
+                # A full NHI is matched by equality in SQL, so it must be here too
+                condition = pc.equal(tbl[col], new.upper())
+            else:
+                condition = pc.match_substring(tbl[col], new, ignore_case=True)
+            mask = condition if mask is None else pc.and_(mask, condition)
+    
+    return None if mask is None else tbl.filter(mask)
+
+
+def build_search_display(tbl: pa.Table) -> pa.Table:
     """
-    escaped_client_id = client_id.replace("'", "''")
+    Format one page of search results for the results grid.
+    Columns are formatted in Arrow once per page load, and the grid takes the Arrow
+    table as is, so it never goes through pandas.
+    """
+    columns = {}
+    for col, label in SEARCH_DISPLAY_COLUMNS.items():
+        if col == 'createdon':
+            columns[label] = pc.fill_null(pc.strftime(tbl[col], format='%Y-%m-%d'), 'N/A')
+        else:
+            columns[label] = pc.fill_null(tbl[col].cast(pa.string()), 'Not available')
+    return pa.table(columns)
+
+
+def load_search_page(criteria: dict, page: int, user_token: str = None):
+    """Run the search for one page of results and reset the selection state."""
+    tbl = None
+    fetched_at = time.monotonic()
+    complete_search = st.session_state.get('complete_search')
+    if page == 0 and complete_search is not None:
+        previous, complete_tbl, complete_fetched_at = complete_search
+        # Past the search cache TTL the kept result is stale too, so it is never narrowed
+        if fetched_at - complete_fetched_at < SEARCH_CACHE_TTL_SECONDS:
+            tbl = refine_search_results(complete_tbl, previous, criteria)
+        if tbl is not None:
+            fetched_at = complete_fetched_at
+    if tbl is None:
+        tbl = search_client_data(**criteria, user_token=user_token, page=page)
     
+    failed = tbl is None
+    if failed:
+        tbl = SEARCH_ARROW_SCHEMA.empty_table()
+    has_more = tbl.num_rows > SEARCH_PAGE_SIZE
+    tbl = tbl.slice(0, SEARCH_PAGE_SIZE)
+    # A first page with nothing after it holds every match, so narrower searches can filter it locally;
+    # a failed query holds nothing, so it is never kept
+    st.session_state.complete_search = (criteria, tbl, fetched_at) if page == 0 and not has_more and not failed else None
+    
+    # The page stays an Arrow table: the grid is built from it by build_search_display and
+    # the selected client id is read straight from its column, so it never needs pandas
+    st.session_state.search_page = page
+    st.session_state.search_has_more = has_more
+    st.session_state.search_results = tbl
+    st.session_state.search_display = build_search_display(tbl) if tbl.num_rows else None
+    st.session_state.selected_row_index = None
+    st.session_state.report_data = None
+    st.session_state.selection_mask = [False] * tbl.num_rows
+
+
+@st.cache_data(ttl=600, max_entries=256, show_spinner=False)
+def run_report_query(client_id: str, token_key: str, _user_token: str = None) -> pa.Table:
+    """
+    Run the report query for one koo_clientid. Results are cached per
+    (client_id, token_key); the raw token is excluded from the cache key.
+    """
     query = f"""
-    SELECT 
-        koo_clientid,
-        client_name,
-        client_nhi,
-        dhb,
-        ethnicity,
-        domicile,
-        gender,
-        primary_caregiver,
-        well_child_level_of_need,
-        topic_tags_house,
-        topic_tags_impairment,
-        topic_tags_mmh,
-        housing_summary,
-        impairments_summary,
-        mmh_summary,
-        housing_risk_flag,
-        impairment_risk_flag,
-        mmh_risk_flag
+    SELECT {REPORT_SELECT_LIST}
     FROM {TABLE_NAME_REPORT}
-    WHERE koo_clientid = '{escaped_client_id}'
+    WHERE koo_clientid = ?
     LIMIT 1
     """
     
+    # Report rows are consumed as scalars, so they stay in Arrow rather than going through pandas
+    return run_query_arrow(query, [client_id], _user_token)
+
+
+def load_report_row(client_id: str, user_token: str = None) -> dict:
+    """
+    Load report data from Databricks table by koo_clientid.
+    Returns: dict of column values for the client or empty dict if not found.
+    """
     try:
-        if user_token:
-            df = sql_query_with_user_token(query, user_token)
-        else:
-            df = sql_query_with_service_principal(query)
-        return df
+        tbl = run_report_query(client_id, token_cache_key(user_token), user_token)
+        if tbl.num_rows == 0:
+            return {}
+        return row_to_dict(tbl)
     except Exception as e:
         st.error(f"Error loading report data: {str(e)}")
-        return pd.DataFrame()
+        return {}
+
+
+# Accepted spellings of a true risk flag; any other string is treated as false
+FLAG_TRUE_VALUES = frozenset({"true", "t", "1", "yes", "y"})
+FLAG_FALSE_VALUES = frozenset({"false", "f", "0", "no", "n", ""})
+
+# Known flag spellings mapped straight to their boolean value
+FLAG_STRING_VALUES = {
+    **{value: True for value in FLAG_TRUE_VALUES},
+    **{value: False for value in FLAG_FALSE_VALUES},
+}
+
+
+def normalize_flag_str(flag: str) -> bool:
+    """Normalize a risk flag string to a boolean, trying the exact spelling before normalising case and whitespace."""
+    value = FLAG_STRING_VALUES.get(flag)
+    if value is None:
+        value = FLAG_STRING_VALUES.get(flag.strip().lower(), False)
+    return value
 
 
 def normalize_flag(flag) -> bool:
@@ -182,66 +441,195 @@ def normalize_flag(flag) -> bool:
     Normalize a risk flag value to a boolean.
     Handles bool, None/NaN, int, float, and string values.
     """
-    if isinstance(flag, bool):
+    if flag is True or flag is False:
         return flag
     
-    if flag is None or (isinstance(flag, float) and pd.isna(flag)):
+    if flag is None:
         return False
     
-    if isinstance(flag, (int, float)):
-        return bool(flag)
-    
     if isinstance(flag, str):
-        v = flag.strip().lower()
-        if v in {"true", "t", "1", "yes", "y"}:
-            return True
-        if v in {"false", "f", "0", "no", "n", ""}:
-            return False
+        return normalize_flag_str(flag)
+    
+    if isinstance(flag, float):
+        return not math.isnan(flag) and bool(flag)
+    
+    if isinstance(flag, int):
+        return bool(flag)
     
     return False
 
 
+@dataclass(frozen=True)
+class PdfColors:
+    """Report colours shared by the PDF styles, header and risk helpers."""
+    brand: colors.Color
+    muted: colors.Color
+    subheading: colors.Color
+    text: colors.Color
+    footer: colors.Color
+    divider: colors.Color
+    risk_high: colors.Color
+    risk_moderate: colors.Color
+    risk_low: colors.Color
+    risk_high_background: colors.Color
+    risk_low_background: colors.Color
+    risk_levels: Mapping[str, colors.Color]
+
+
+@st.cache_resource(show_spinner=False)
+def get_pdf_colors() -> PdfColors:
+    """
+    Parse the report colours once per process.
+    Module-level code re-runs on every Streamlit rerun, so they are cached here instead.
+    """
+    risk_high = colors.HexColor("#C41E3A")
+    risk_moderate = colors.HexColor("#FF8C00")
+    risk_low = colors.HexColor("#228B22")
+    return PdfColors(
+        brand=colors.HexColor("#0099D8"),
+        muted=colors.HexColor("#666666"),
+        subheading=colors.HexColor("#444444"),
+        text=colors.HexColor("#333333"),
+        footer=colors.HexColor("#999999"),
+        divider=colors.HexColor("#DEE2E6"),
+        risk_high=risk_high,
+        risk_moderate=risk_moderate,
+        risk_low=risk_low,
+        risk_high_background=colors.HexColor("#FFF0F0"),
+        risk_low_background=colors.HexColor("#F0FFF0"),
+        risk_levels={
+            "HIGH RISK": risk_high,
+            "MODERATE RISK": risk_moderate,
+            "LOW RISK": risk_low
+        }
+    )
+
+
+# Overall risk level indexed by the number of raised flags (0-3)
+RISK_LEVELS_BY_COUNT = ("LOW RISK", "MODERATE RISK", "HIGH RISK", "HIGH RISK")
+
+
 def get_risk_level(housing_risk, impairment_risk, mmh_risk) -> str:
     """Determine overall risk level based on individual risk flags."""
-    flags = [
-        normalize_flag(housing_risk),
-        normalize_flag(impairment_risk),
-        normalize_flag(mmh_risk),
-    ]
-    risk_count = sum(flags)
-    
-    if risk_count >= 2:
-        return "HIGH RISK"
-    elif risk_count == 1:
-        return "MODERATE RISK"
-    else:
-        return "LOW RISK"
+    risk_count = normalize_flag(housing_risk) + normalize_flag(impairment_risk) + normalize_flag(mmh_risk)
+    return RISK_LEVELS_BY_COUNT[risk_count]
 
 
 def get_risk_color(risk_level: str) -> colors.Color:
     """Get color based on risk level."""
-    if risk_level == "HIGH RISK":
-        return colors.HexColor("#C41E3A")
-    elif risk_level == "MODERATE RISK":
-        return colors.HexColor("#FF8C00")
-    else:
-        return colors.HexColor("#228B22")
+    pdf_colors = get_pdf_colors()
+    return pdf_colors.risk_levels.get(risk_level, pdf_colors.risk_low)
 
 
 def safe_str(value) -> str:
     """Safely convert value to string, handling None/NaN values."""
-    if pd.isna(value) or value is None:
+    # Report rows come from Arrow as plain Python scalars, so None and str are the common cases
+    if value is None:
+        return "Not available"
+    if isinstance(value, str):
+        return value
+    if isinstance(value, float) and math.isnan(value):
         return "Not available"
     return str(value)
 
 
 def format_risk_flag(flag) -> str:
     """Format risk flag for display."""
-    if flag is None or (isinstance(flag, float) and pd.isna(flag)):
+    if flag is None or (isinstance(flag, float) and math.isnan(flag)):
         return "Not assessed"
     return "HIGH RISK" if normalize_flag(flag) else "LOW RISK"
 
 
+@dataclass(frozen=True, slots=True)
+class ReportView:
+    """Display strings for one report row, shared by the PDF and the Streamlit preview."""
+    client_name: str
+    client_nhi: str
+    dhb: str
+    ethnicity: str
+    domicile: str
+    gender: str
+    primary_caregiver: str
+    well_child_level_of_need: str
+    housing_topics: str
+    impairment_topics: str
+    mmh_topics: str
+    housing_summary: str
+    impairment_summary: str
+    mmh_summary: str
+    housing_risk_flag: str
+    impairment_risk_flag: str
+    mmh_risk_flag: str
+
+
+def build_report_view(data_row: Mapping[str, Any]) -> ReportView:
+    """Convert a report row into display strings once, so the PDF and preview don't each re-parse it."""
+    return ReportView(
+        client_name=safe_str(data_row.get('client_name', '')),
+        client_nhi=safe_str(data_row.get('client_nhi', '')),
+        dhb=safe_str(data_row.get('dhb', '')),
+        ethnicity=safe_str(data_row.get('ethnicity', '')),
+        domicile=safe_str(data_row.get('domicile', '')),
+        gender=safe_str(data_row.get('gender', '')),
+        primary_caregiver=safe_str(data_row.get('primary_caregiver', '')),
+        well_child_level_of_need=safe_str(data_row.get('well_child_level_of_need', '')),
+        housing_topics=safe_str(data_row.get('topic_tags_house', '')),
+        impairment_topics=safe_str(data_row.get('topic_tags_impairment', '')),
+        mmh_topics=safe_str(data_row.get('topic_tags_mmh', '')),
+        housing_summary=safe_str(data_row.get('housing_summary', '')),
+        impairment_summary=safe_str(data_row.get('impairments_summary', '')),
+        mmh_summary=safe_str(data_row.get('mmh_summary', '')),
+        housing_risk_flag=safe_str(data_row.get('housing_risk_flag', '')),
+        impairment_risk_flag=safe_str(data_row.get('impairment_risk_flag', '')),
+        mmh_risk_flag=safe_str(data_row.get('mmh_risk_flag', ''))
+    )
+
+
+# (label, ReportView field) pairs for the report's list sections, shared by the PDF and preview
+REPORT_TOPIC_FIELDS = (
+    ("Housing", "housing_topics"),
+    ("Impairment", "impairment_topics"),
+    ("Mental/Maternal Health", "mmh_topics"),
+)
+REPORT_SUMMARY_FIELDS = (
+    ("Housing Situation", "housing_summary"),
+    ("Impairment Status", "impairment_summary"),
+    ("Mental/Maternal Health", "mmh_summary"),
+)
+REPORT_RISK_FIELDS = (
+    ("Housing", "housing_risk_flag"),
+    ("Impairment", "impairment_risk_flag"),
+    ("MMH", "mmh_risk_flag"),
+)
+
+
+def header_wave_curves(width: float, height: float) -> tuple:
+    """
+    Return the header's wave edge, one period of a raised cosine, as four cubic Bezier
+    segments (x1, y1, x2, y2, x3, y3) starting from (0, 0).
+    Control points come from the curve's slope at each quarter, which keeps the curve
+    within 0.6% of the wave height of the true cosine.
+    """
+    wave_height = height * 0.25
+    
+    def wave_y(t):
+        return wave_height * (0.5 - 0.5 * math.cos(2 * math.pi * t))
+    
+    def wave_slope(t):
+        return wave_height * math.pi * math.sin(2 * math.pi * t)
+    
+    segments = []
+    for quarter in range(4):
+        t0, t1 = quarter / 4, (quarter + 1) / 4
+        step = (t1 - t0) / 3
+        segments.append((
+            (t0 + step) * width, wave_y(t0) + step * wave_slope(t0),
+            (t1 - step) * width, wave_y(t1) - step * wave_slope(t1),
+            t1 * width, wave_y(t1)
+        ))
+    return tuple(segments)
+
+
 class PDFHeader(Flowable):
     """Custom flowable for PDF header with blue background, wave pattern, and logo."""
     
@@ -254,22 +642,15 @@ class PDFHeader(Flowable):
     def draw(self):
         c = self.canv
         
-        c.setFillColor(colors.HexColor("#0099D8"))
+        c.setFillColor(get_pdf_colors().brand)
         c.rect(0, 0, self.width, self.height, fill=1, stroke=0)
         
         c.setFillColor(colors.white)
         wave_path = c.beginPath()
         wave_path.moveTo(0, 0)
         
-        wave_height = self.height * 0.25
-        num_points = 100
-        for i in range(num_points + 1):
-            x = (i / num_points) * self.width
-            y = wave_height * (0.5 + 0.5 * math.sin((i / num_points) * math.pi * 2 - math.pi / 2))
-            if i == 0:
-                wave_path.moveTo(x, y)
-            else:
-                wave_path.lineTo(x, y)
+        for segment in header_wave_curves(self.width, self.height):
+            wave_path.curveTo(*segment)
         
         wave_path.lineTo(self.width, 0)
         wave_path.lineTo(0, 0)
@@ -290,237 +671,239 @@ class PDFHeader(Flowable):
         return (self.width, self.height)
 
 
-def generate_pdf(data_row: pd.Series) -> BytesIO:
+@dataclass(frozen=True)
+class PdfStyles:
+    """ReportLab paragraph and table styles shared by every generated report."""
+    title: ParagraphStyle
+    subtitle: ParagraphStyle
+    section_header: ParagraphStyle
+    subsection: ParagraphStyle
+    body: ParagraphStyle
+    risk_high: ParagraphStyle
+    risk_low: ParagraphStyle
+    footer: ParagraphStyle
+    client_info_table: TableStyle
+
+
+@st.cache_resource(show_spinner=False)
+def get_pdf_styles() -> PdfStyles:
     """
-    Generate formatted PDF report from data row.
-    Returns: PDF file buffer.
+    Build the report styles once per process.
+    Module-level code re-runs on every Streamlit rerun, so they are cached here instead.
     """
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(
-        buffer,
-        pagesize=A4,
-        rightMargin=1*cm,
-        leftMargin=1*cm,
-        topMargin=1*cm,
-        bottomMargin=1*cm
-    )
-    
     styles = getSampleStyleSheet()
-    
-    title_style = ParagraphStyle(
-        'CustomTitle',
-        parent=styles['Heading1'],
-        fontSize=16,
-        textColor=colors.HexColor("#0099D8"),
-        spaceAfter=6,
-        alignment=TA_LEFT
-    )
-    
-    subtitle_style = ParagraphStyle(
-        'CustomSubtitle',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.HexColor("#666666"),
-        spaceAfter=12
-    )
-    
-    section_header_style = ParagraphStyle(
-        'SectionHeader',
-        parent=styles['Heading2'],
-        fontSize=12,
-        textColor=colors.HexColor("#0099D8"),
-        spaceBefore=14,
-        spaceAfter=6,
-        borderPadding=4
-    )
-    
-    subsection_style = ParagraphStyle(
-        'SubSection',
-        parent=styles['Heading3'],
-        fontSize=10,
-        textColor=colors.HexColor("#444444"),
-        spaceBefore=10,
-        spaceAfter=4
-    )
-    
-    body_style = ParagraphStyle(
-        'CustomBody',
-        parent=styles['Normal'],
-        fontSize=10,
-        textColor=colors.HexColor("#333333"),
-        spaceAfter=8,
-        leading=14
-    )
-    
-    risk_high_style = ParagraphStyle(
-        'RiskHigh',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=colors.HexColor("#C41E3A"),
-        spaceBefore=4,
-        spaceAfter=4,
-        backColor=colors.HexColor("#FFF0F0"),
-        borderPadding=8
-    )
-    
-    risk_low_style = ParagraphStyle(
-        'RiskLow',
-        parent=styles['Normal'],
-        fontSize=11,
-        textColor=colors.HexColor("#228B22"),
-        spaceBefore=4,
-        spaceAfter=4,
-        backColor=colors.HexColor("#F0FFF0"),
-        borderPadding=8
-    )
-    
-    footer_style = ParagraphStyle(
-        'Footer',
-        parent=styles['Normal'],
-        fontSize=9,
-        textColor=colors.HexColor("#999999"),
-        alignment=TA_RIGHT,
-        spaceBefore=20
+    pdf_colors = get_pdf_colors()
+    return PdfStyles(
+        title=ParagraphStyle(
+            'CustomTitle',
+            parent=styles['Heading1'],
+            fontSize=16,
+            textColor=pdf_colors.brand,
+            spaceAfter=6,
+            alignment=TA_LEFT
+        ),
+        subtitle=ParagraphStyle(
+            'CustomSubtitle',
+            parent=styles['Normal'],
+            fontSize=10,
+            textColor=pdf_colors.muted,
+            spaceAfter=12
+        ),
+        section_header=ParagraphStyle(
+            'SectionHeader',
+            parent=styles['Heading2'],
+            fontSize=12,
+            textColor=pdf_colors.brand,
+            spaceBefore=14,
+            spaceAfter=6,
+            borderPadding=4
+        ),
+        subsection=ParagraphStyle(
+            'SubSection',
+            parent=styles['Heading3'],
+            fontSize=10,
+            textColor=pdf_colors.subheading,
+            spaceBefore=10,
+            spaceAfter=4
+        ),
+        body=ParagraphStyle(
+            'CustomBody',
+            parent=styles['Normal'],
+            fontSize=10,
+            textColor=pdf_colors.text,
+            spaceAfter=8,
+            leading=14
+        ),
+        risk_high=ParagraphStyle(
+            'RiskHigh',
+            parent=styles['Normal'],
+            fontSize=11,
+            textColor=pdf_colors.risk_high,
+            spaceBefore=4,
+            spaceAfter=4,
+            backColor=pdf_colors.risk_high_background,
+            borderPadding=8
+        ),
+        risk_low=ParagraphStyle(
+            'RiskLow',
+            parent=styles['Normal'],
+            fontSize=11,
+            textColor=pdf_colors.risk_low,
+            spaceBefore=4,
+            spaceAfter=4,
+            backColor=pdf_colors.risk_low_background,
+            borderPadding=8
+        ),
+        footer=ParagraphStyle(
+            'Footer',
+            parent=styles['Normal'],
+            fontSize=9,
+            textColor=pdf_colors.footer,
+            alignment=TA_RIGHT,
+            spaceBefore=20
+        ),
+        client_info_table=TableStyle([
+            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 0), (-1, -1), 9),
+            ('TEXTCOLOR', (0, 0), (0, -1), pdf_colors.muted),
+            ('TEXTCOLOR', (2, 0), (2, -1), pdf_colors.muted),
+            ('TEXTCOLOR', (1, 0), (1, -1), pdf_colors.text),
+            ('TEXTCOLOR', (3, 0), (3, -1), pdf_colors.text),
+            ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
+            ('FONTNAME', (3, 0), (3, -1), 'Helvetica-Bold'),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
+            ('TOPPADDING', (0, 0), (-1, -1), 8),
+            ('LEFTPADDING', (0, 0), (-1, -1), 4),
+            ('RIGHTPADDING', (0, 0), (-1, -1), 12),
+        ])
     )
+
+
+def divider(spaceBefore: float = 1, spaceAfter: float = 1) -> HRFlowable:
+    """Return a full-width horizontal rule used between report sections."""
+    return HRFlowable(width="100%", thickness=1, color=get_pdf_colors().divider, spaceBefore=spaceBefore, spaceAfter=spaceAfter)
+
+
+# Embed images as binary Flate streams. With the default ASCII85 encoding, ReportLab
+# text-encodes the header logo in pure Python for every report, which was most of
+# the time spent building a PDF.
+rl_config.useA85 = 0
+
+# Page geometry shared by every generated report
+PDF_DOC_OPTIONS = dict(
+    pagesize=A4,
+    rightMargin=1*cm,
+    leftMargin=1*cm,
+    topMargin=1*cm,
+    bottomMargin=1*cm
+)
+PDF_CONTENT_WIDTH = A4[0] - 2*cm
+PDF_HEADER_HEIGHT = 2.5*cm
+PDF_CLIENT_INFO_COL_WIDTHS = (3.2*cm, 5.5*cm, 3.8*cm, 5.5*cm)
+PDF_LOGO_PATH = os.path.join(os.path.dirname(__file__), 'assets', 'logo.png')
+
+
+def generate_pdf(report: ReportView, generated_at: datetime) -> bytes:
+    """
+    Generate formatted PDF report from a report view, stamped with `generated_at`.
+    Returns: PDF file contents.
+    """
+    styles = get_pdf_styles()
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, **PDF_DOC_OPTIONS)
     
     story = []
     
-    page_width = A4[0] - 2*cm
-    logo_path = os.path.join(os.path.dirname(__file__), 'assets', 'logo.png')
-    header = PDFHeader(width=page_width, height=2.5*cm, logo_path=logo_path)
+    header = PDFHeader(width=PDF_CONTENT_WIDTH, height=PDF_HEADER_HEIGHT, logo_path=PDF_LOGO_PATH)
     story.append(header)
     story.append(Spacer(1, 12))
     
-    story.append(Paragraph("CLIENT BACKGROUND REPORT", title_style))
-    story.append(Paragraph("Based on Plunket AI Model Analysis", subtitle_style))
+    story.append(Paragraph("CLIENT BACKGROUND REPORT", styles.title))
+    story.append(Paragraph("Based on Plunket AI Model Analysis", styles.subtitle))
     
-    story.append(HRFlowable(
-        width="100%",
-        thickness=1,
-        color=colors.HexColor("#DEE2E6"),
-        spaceBefore=4,
-        spaceAfter=12
-    ))
+    story.append(divider(spaceBefore=4, spaceAfter=12))
     
     # CLIENT INFORMATION section
-    story.append(Paragraph("CLIENT INFORMATION", section_header_style))
-    
-    client_name = safe_str(data_row.get('client_name', ''))
-    client_nhi = safe_str(data_row.get('client_nhi', ''))
-    dhb = safe_str(data_row.get('dhb', ''))
-    ethnicity = safe_str(data_row.get('ethnicity', ''))
-    domicile = safe_str(data_row.get('domicile', ''))
-    gender = safe_str(data_row.get('gender', ''))
-    primary_caregiver = safe_str(data_row.get('primary_caregiver', ''))
-    well_child_level_of_need = safe_str(data_row.get('well_child_level_of_need', ''))
+    story.append(Paragraph("CLIENT INFORMATION", styles.section_header))
     
     client_info_data = [
-        ['Client Name:', client_name, 'Client NHI:', client_nhi],
-        ['DHB:', dhb, 'Ethnicity:', ethnicity],
-        ['Domicile:', domicile, 'Gender:', gender],
-        ['Primary Caregiver:', primary_caregiver, 'Well Child Level of Need:', well_child_level_of_need],
-        ['Generated:', datetime.now().strftime('%Y-%m-%d %H:%M'), '', '']
+        ['Client Name:', report.client_name, 'Client NHI:', report.client_nhi],
+        ['DHB:', report.dhb, 'Ethnicity:', report.ethnicity],
+        ['Domicile:', report.domicile, 'Gender:', report.gender],
+        ['Primary Caregiver:', report.primary_caregiver, 'Well Child Level of Need:', report.well_child_level_of_need],
+        ['Generated:', generated_at.strftime('%Y-%m-%d %H:%M'), '', '']
     ]
     
-    client_info_table = Table(client_info_data, colWidths=[3.2*cm, 5.5*cm, 3.8*cm, 5.5*cm])
-    client_info_table.setStyle(TableStyle([
-        ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-        ('FONTSIZE', (0, 0), (-1, -1), 9),
-        ('TEXTCOLOR', (0, 0), (0, -1), colors.HexColor("#666666")),
-        ('TEXTCOLOR', (2, 0), (2, -1), colors.HexColor("#666666")),
-        ('TEXTCOLOR', (1, 0), (1, -1), colors.HexColor("#333333")),
-        ('TEXTCOLOR', (3, 0), (3, -1), colors.HexColor("#333333")),
-        ('FONTNAME', (1, 0), (1, -1), 'Helvetica-Bold'),
-        ('FONTNAME', (3, 0), (3, -1), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, -1), 8),
-        ('TOPPADDING', (0, 0), (-1, -1), 8),
-        ('LEFTPADDING', (0, 0), (-1, -1), 4),
-        ('RIGHTPADDING', (0, 0), (-1, -1), 12),
-    ]))
+    client_info_table = Table(client_info_data, colWidths=PDF_CLIENT_INFO_COL_WIDTHS)
+    client_info_table.setStyle(styles.client_info_table)
     story.append(client_info_table)
     story.append(Spacer(1, 12))
     
-    story.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor("#DEE2E6"), spaceAfter=8))
+    story.append(divider(spaceAfter=8))
     
-    story.append(Paragraph("DISCUSSION TOPICS", section_header_style))
+    story.append(Paragraph("DISCUSSION TOPICS", styles.section_header))
     
-    housing_topics = safe_str(data_row.get('topic_tags_house', ''))
-    impairment_topics = safe_str(data_row.get('topic_tags_impairment', ''))
-    mmh_topics = safe_str(data_row.get('topic_tags_mmh', ''))
-    
-    story.append(Paragraph(f"&bull; <b>Housing:</b> {housing_topics}", body_style))
-    story.append(Paragraph(f"&bull; <b>Impairment:</b> {impairment_topics}", body_style))
-    story.append(Paragraph(f"&bull; <b>Mental/Maternal Health:</b> {mmh_topics}", body_style))
+    for label, attr in REPORT_TOPIC_FIELDS:
+        story.append(Paragraph(f"&bull; <b>{label}:</b> {getattr(report, attr)}", styles.body))
     
     story.append(Spacer(1, 12))
-    story.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor("#DEE2E6"), spaceAfter=8))
-    
-    story.append(Paragraph("SUMMARIES", section_header_style))
+    story.append(divider(spaceAfter=8))
     
-    story.append(Paragraph("Housing Situation:", subsection_style))
-    housing_summary = safe_str(data_row.get('housing_summary', ''))
-    story.append(Paragraph(housing_summary, body_style))
+    story.append(Paragraph("SUMMARIES", styles.section_header))
     
-    story.append(Paragraph("Impairment Status:", subsection_style))
-    impairment_summary = safe_str(data_row.get('impairments_summary', ''))
-    story.append(Paragraph(impairment_summary, body_style))
-    
-    story.append(Paragraph("Mental/Maternal Health:", subsection_style))
-    mmh_summary = safe_str(data_row.get('mmh_summary', ''))
-    story.append(Paragraph(mmh_summary, body_style))
+    for label, attr in REPORT_SUMMARY_FIELDS:
+        story.append(Paragraph(f"{label}:", styles.subsection))
+        story.append(Paragraph(getattr(report, attr), styles.body))
     
     story.append(Spacer(1, 12))
-    story.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor("#DEE2E6"), spaceAfter=8))
+    story.append(divider(spaceAfter=8))
     
-    story.append(Paragraph("RISK FLAGS", section_header_style))
+    story.append(Paragraph("RISK FLAGS", styles.section_header))
     
     # Use raw risk flag values from database columns
-    housing_risk_raw = safe_str(data_row.get('housing_risk_flag', ''))
-    impairment_risk_raw = safe_str(data_row.get('impairment_risk_flag', ''))
-    mmh_risk_raw = safe_str(data_row.get('mmh_risk_flag', ''))
-    
-    story.append(Paragraph(f"&bull; <b>Housing:</b> {housing_risk_raw}", body_style))
-    story.append(Paragraph(f"&bull; <b>Impairment:</b> {impairment_risk_raw}", body_style))
-    story.append(Paragraph(f"&bull; <b>MMH:</b> {mmh_risk_raw}", body_style))
+    for label, attr in REPORT_RISK_FIELDS:
+        story.append(Paragraph(f"&bull; <b>{label}:</b> {getattr(report, attr)}", styles.body))
     
     story.append(Spacer(1, 20))
-    story.append(HRFlowable(width="100%", thickness=1, color=colors.HexColor("#DEE2E6"), spaceAfter=8))
+    story.append(divider(spaceAfter=8))
     
-    story.append(Paragraph("Generated by Plunket AI Model.", footer_style))
+    story.append(Paragraph("Generated by Plunket AI Model.", styles.footer))
     
     doc.build(story)
-    buffer.seek(0)
-    return buffer
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+    return pdf_bytes
+
+
+@st.cache_data(ttl=1800, max_entries=32, show_spinner=False)
+def build_pdf_bytes(report: ReportView, generated_at: datetime) -> bytes:
+    """
+    Build the PDF for a report view.
+    Cached so downloading the same report again skips the ReportLab build. The generation
+    time is part of the key, so a cached PDF never carries another build's timestamp.
+    """
+    return generate_pdf(report, generated_at)
+
+
+@st.cache_resource(show_spinner=False)
+def get_pdf_executor() -> ThreadPoolExecutor:
+    """Thread pool used to build report PDFs while the rest of the page renders."""
+    return ThreadPoolExecutor(max_workers=4)
+
 
+def submit_pdf_build(report: ReportView, generated_at: datetime) -> Future:
+    """
+    Start building the report PDF in the background.
+    The result lands in the build_pdf_bytes cache, and a download clicked while
+    the build is still running waits on it rather than starting a second one.
+    """
+    return get_pdf_executor().submit(build_pdf_bytes, report, generated_at)
 
-def render_report_preview(data_row: pd.Series):
+
+def render_report_preview(report: ReportView):
     """Render a preview of the report in Streamlit using native components."""
-    # Client information
-    client_name = safe_str(data_row.get('client_name', ''))
-    client_nhi = safe_str(data_row.get('client_nhi', ''))
-    dhb = safe_str(data_row.get('dhb', ''))
-    ethnicity = safe_str(data_row.get('ethnicity', ''))
-    domicile = safe_str(data_row.get('domicile', ''))
-    gender = safe_str(data_row.get('gender', ''))
-    primary_caregiver = safe_str(data_row.get('primary_caregiver', ''))
-    well_child_level_of_need = safe_str(data_row.get('well_child_level_of_need', ''))
-    
-    # Discussion topics
-    housing_topics = safe_str(data_row.get('topic_tags_house', ''))
-    impairment_topics = safe_str(data_row.get('topic_tags_impairment', ''))
-    mmh_topics = safe_str(data_row.get('topic_tags_mmh', ''))
-    
-    # Summaries
-    housing_summary = safe_str(data_row.get('housing_summary', ''))
-    impairment_summary = safe_str(data_row.get('impairments_summary', ''))
-    mmh_summary = safe_str(data_row.get('mmh_summary', ''))
-    
-    # Risk flags
-    housing_risk_raw = safe_str(data_row.get('housing_risk_flag', ''))
-    impairment_risk_raw = safe_str(data_row.get('impairment_risk_flag', ''))
-    mmh_risk_raw = safe_str(data_row.get('mmh_risk_flag', ''))
-    
-    # Use native Streamlit components for reliable rendering
+    # Each section is composed into a single markdown element so the preview
+    # is sent to the browser as a handful of elements rather than one per line
     with st.container():
         st.subheader("Client Background Report")
         st.caption("Based on Plunket AI Model Analysis")
@@ -531,54 +914,42 @@ def render_report_preview(data_row: pd.Series):
         st.markdown("### CLIENT INFORMATION")
         col1, col2 = st.columns(2)
         with col1:
-            st.markdown(f"**Client Name:** {client_name}")
-            st.markdown(f"**DHB:** {dhb}")
-            st.markdown(f"**Domicile:** {domicile}")
-            st.markdown(f"**Primary Caregiver:** {primary_caregiver}")
+            st.markdown(
+                f"**Client Name:** {report.client_name}\n\n"
+                f"**DHB:** {report.dhb}\n\n"
+                f"**Domicile:** {report.domicile}\n\n"
+                f"**Primary Caregiver:** {report.primary_caregiver}"
+            )
         with col2:
-            st.markdown(f"**Client NHI:** {client_nhi}")
-            st.markdown(f"**Ethnicity:** {ethnicity}")
-            st.markdown(f"**Gender:** {gender}")
-            st.markdown(f"**Well Child Level of Need:** {well_child_level_of_need}")
-        
-        st.divider()
-        
-        # DISCUSSION TOPICS section
-        st.markdown("### DISCUSSION TOPICS")
-        st.markdown(f"- **Housing:** {housing_topics}")
-        st.markdown(f"- **Impairment:** {impairment_topics}")
-        st.markdown(f"- **Mental/Maternal Health:** {mmh_topics}")
-        
-        st.divider()
-        
-        # SUMMARIES section
-        st.markdown("### SUMMARIES")
-        
-        st.markdown(f"**Housing Situation:**")
-        st.markdown(housing_summary)
-        
-        st.markdown(f"**Impairment Status:**")
-        st.markdown(impairment_summary)
-        
-        st.markdown(f"**Mental/Maternal Health:**")
-        st.markdown(mmh_summary)
-        
-        st.divider()
+            st.markdown(
+                f"**Client NHI:** {report.client_nhi}\n\n"
+                f"**Ethnicity:** {report.ethnicity}\n\n"
+                f"**Gender:** {report.gender}\n\n"
+                f"**Well Child Level of Need:** {report.well_child_level_of_need}"
+            )
         
-        # RISK FLAGS section
-        st.markdown("### RISK FLAGS")
-        st.markdown(f"- **Housing:** {housing_risk_raw}")
-        st.markdown(f"- **Impairment:** {impairment_risk_raw}")
-        st.markdown(f"- **MMH:** {mmh_risk_raw}")
+        # DISCUSSION TOPICS, SUMMARIES and RISK FLAGS sections
+        sections = [
+            "---",
+            "### DISCUSSION TOPICS",
+            "\n".join(f"- **{label}:** {getattr(report, attr)}" for label, attr in REPORT_TOPIC_FIELDS),
+            "---",
+            "### SUMMARIES",
+        ]
+        for label, attr in REPORT_SUMMARY_FIELDS:
+            sections.append(f"**{label}:**")
+            sections.append(getattr(report, attr))
+        sections.append("---")
+        sections.append("### RISK FLAGS")
+        sections.append("\n".join(f"- **{label}:** {getattr(report, attr)}" for label, attr in REPORT_RISK_FIELDS))
+        st.markdown("\n\n".join(sections))
 
 
-st.set_page_config(
-    page_title="Healthcare Dashboard",
-    page_icon="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>PDF</text></svg>",
-    layout="wide"
-)
+# Characters in a client name that are replaced in the PDF download filename
+REPORT_FILENAME_TRANSLATION = str.maketrans({' ': '_', '/': '_', '\\': '_'})
 
-st.markdown("""
+# Page styling and static markup, defined once at import
+APP_CSS = """
 <style>
     .stApp {
         background-color: #0D1117;
@@ -682,9 +1053,9 @@ st.markdown("""
         background-color: #3B82F6 !important;
     }
 </style>
-""", unsafe_allow_html=True)
+"""
 
-st.markdown("""
+APP_HEADER_HTML = """
 <div class="main-header">
     <div class="pdf-icon">PDF</div>
     <div>
@@ -692,18 +1063,57 @@ st.markdown("""
         <p style="color: #8B949E; margin: 0;">Search for client records and generate reports.</p>
     </div>
 </div>
-""", unsafe_allow_html=True)
+"""
+
+SEARCH_PROMPT_HTML = """
+<div class="empty-state">
+    <p>Enter search criteria above and click Search to find client records.</p>
+</div>
+"""
+
+NO_RESULTS_HTML = """
+<div class="empty-state">
+    <p>No records found. Try adjusting your search criteria.</p>
+</div>
+"""
+
+REPORT_PREVIEW_BANNER_HTML = """
+<div style="background-color: #161B22; padding: 10px; border-radius: 8px; text-align: center; margin-bottom: 10px; border: 1px solid #30363D;">
+    <span style="color: #8B949E;">Report Preview</span>
+</div>
+"""
+
+
+st.set_page_config(
+    page_title="Healthcare Dashboard",
+    page_icon="data:image/svg+xml,<svg xmlns='http://www.w3.org/2000/svg' viewBox='0 0 100 100'><text y='.9em' font-size='90'>PDF</text></svg>",
+    layout="wide"
+)
+
+st.markdown(APP_CSS, unsafe_allow_html=True)
+
+st.markdown(APP_HEADER_HTML, unsafe_allow_html=True)
 
 user_token = st.context.headers.get('X-Forwarded-Access-Token')
 
 if 'search_results' not in st.session_state:
     st.session_state.search_results = None
+if 'search_display' not in st.session_state:
+    st.session_state.search_display = None
 if 'selected_row_index' not in st.session_state:
     st.session_state.selected_row_index = None
 if 'report_data' not in st.session_state:
     st.session_state.report_data = None
 if 'selection_mask' not in st.session_state:
     st.session_state.selection_mask = []
+if 'search_criteria' not in st.session_state:
+    st.session_state.search_criteria = None
+if 'search_page' not in st.session_state:
+    st.session_state.search_page = 0
+if 'search_has_more' not in st.session_state:
+    st.session_state.search_has_more = False
+if 'complete_search' not in st.session_state:
+    st.session_state.complete_search = None
 
 st.markdown('<div class="section-header">Search Criteria</div>', unsafe_allow_html=True)
 
@@ -726,107 +1136,109 @@ if search_clicked:
     if not client_name_input and not client_nhi_input and not report_date_input:
         st.error("Please enter at least one search criteria (Client Name, Client NHI, or Report Date).")
     else:
+        st.session_state.search_criteria = {
+            'client_name': client_name_input if client_name_input else None,
+            'client_nhi': client_nhi_input if client_nhi_input else None,
+            'assessment_date': report_date_input if report_date_input else None
+        }
         with st.spinner("Searching..."):
-            df = search_client_data(
-                client_name=client_name_input if client_name_input else None,
-                client_nhi=client_nhi_input if client_nhi_input else None,
-                assessment_date=report_date_input if report_date_input else None,
-                user_token=user_token
-            )
-            st.session_state.search_results = df
-            st.session_state.selected_row_index = None
-            st.session_state.report_data = None
-            st.session_state.selection_mask = [False] * len(df) if not df.empty else []
+            load_search_page(st.session_state.search_criteria, 0, user_token)
 
 st.markdown("---")
 
-st.markdown('<div class="section-header">Search Results</div>', unsafe_allow_html=True)
 
-if st.session_state.search_results is not None:
-    df = st.session_state.search_results
-    
-    if df.empty:
-        st.markdown("""
-        <div class="empty-state">
-            <p>No records found. Try adjusting your search criteria.</p>
-        </div>
-        """, unsafe_allow_html=True)
-    else:
-        display_df = pd.DataFrame({
-            'Client Name': df['client_name'].apply(safe_str),
-            'Client NHI': df['client_nhi'].apply(safe_str),
-            'Response House': df['response_house'].apply(safe_str),
-            'Response Impa': df['response_impa'].apply(safe_str),
-            'Response MMH': df['response_mmh'].apply(safe_str),
-            'Create Date': df['createdon'].apply(lambda x: x.strftime('%Y-%m-%d') if pd.notna(x) and hasattr(x, 'strftime') else str(x)[:10] if pd.notna(x) else 'N/A')
-        })
-        
-        n_rows = len(display_df)
-        
-        if len(st.session_state.selection_mask) != n_rows:
-            st.session_state.selection_mask = [False] * n_rows
-        
-        previous_mask = st.session_state.selection_mask.copy()
-        
-        editor_df = display_df.copy()
-        editor_df.insert(0, 'Select', previous_mask)
-        
-        edited_df = st.data_editor(
-            editor_df,
-            column_config={
-                "Select": st.column_config.CheckboxColumn(
-                    "Select",
-                    help="Select a record (only one can be selected)",
-                    default=False,
-                    width="small"
-                )
-            },
-            disabled=['Client Name', 'Client NHI', 'Response House', 'Response Impa', 'Response MMH', 'Create Date'],
-            hide_index=True,
-            use_container_width=True,
-            height=min(280, 56 * (n_rows + 1)),
-            key="results_editor"
-        )
-        
-        new_mask = edited_df['Select'].tolist()
-        
-        if sum(new_mask) > 1:
-            changed_indices = [i for i, (old, new) in enumerate(zip(previous_mask, new_mask)) if old != new]
-            if changed_indices:
-                selected_idx = changed_indices[-1]
-            else:
-                selected_idx = next(i for i, v in enumerate(new_mask) if v)
-            new_mask = [i == selected_idx for i in range(n_rows)]
-            st.session_state.selection_mask = new_mask
-            st.session_state.selected_row_index = selected_idx
-            st.rerun()
-        elif sum(new_mask) == 1:
-            selected_idx = next(i for i, v in enumerate(new_mask) if v)
-            st.session_state.selection_mask = new_mask
-            st.session_state.selected_row_index = selected_idx
+@st.fragment
+def render_results(user_token: str = None):
+    """
+    Render the search results grid, report actions and report preview.
+    Runs as a fragment, so selecting a row or toggling the preview reruns only this
+    part of the page instead of the header and search form above it.
+    """
+    st.markdown('<div class="section-header">Search Results</div>', unsafe_allow_html=True)
+
+    if st.session_state.search_results is not None:
+        if st.session_state.search_results.num_rows == 0:
+            st.markdown(NO_RESULTS_HTML, unsafe_allow_html=True)
         else:
-            st.session_state.selection_mask = new_mask
-            st.session_state.selected_row_index = None
+            display_table = st.session_state.search_display
+            
+            n_rows = display_table.num_rows
+            
+            if len(st.session_state.selection_mask) != n_rows:
+                st.session_state.selection_mask = [False] * n_rows
+            
+            previous_mask = st.session_state.selection_mask.copy()
+            
+            editor_table = display_table.add_column(0, 'Select', pa.array(previous_mask, pa.bool_()))
+            
+            edited_table = st.data_editor(
+                editor_table,
+                column_config={
+                    "Select": st.column_config.CheckboxColumn(
+                        "Select",
+                        help="Select a record (only one can be selected)",
+                        default=False,
+                        width="small"
+                    )
+                },
+                disabled=['Client Name', 'Client NHI', 'Response House', 'Response Impa', 'Response MMH', 'Create Date'],
+                hide_index=True,
+                use_container_width=True,
+                height=min(280, 56 * (n_rows + 1)),
+                key="results_editor"
+            )
+            
+            new_mask = edited_table['Select'].to_pylist()
+            # Pages hold at most SEARCH_PAGE_SIZE rows, so one pass over a plain list is enough
+            checked = [i for i, v in enumerate(new_mask) if v]
+            
+            if len(checked) > 1:
+                changed_indices = [i for i in checked if not previous_mask[i]]
+                selected_idx = changed_indices[-1] if changed_indices else checked[0]
+                new_mask = [i == selected_idx for i in range(n_rows)]
+                st.session_state.selection_mask = new_mask
+                st.session_state.selected_row_index = selected_idx
+                st.rerun()
+            elif len(checked) == 1:
+                selected_idx = checked[0]
+                st.session_state.selection_mask = new_mask
+                st.session_state.selected_row_index = selected_idx
+            else:
+                st.session_state.selection_mask = new_mask
+                st.session_state.selected_row_index = None
+            
+            st.caption(f"Showing {n_rows} result(s) on page {st.session_state.search_page + 1}")
         
-        st.caption(f"Showing {n_rows} result(s)")
-else:
-    st.markdown("""
-    <div class="empty-state">
-        <p>Enter search criteria above and click Search to find client records.</p>
-    </div>
-    """, unsafe_allow_html=True)
+        # The pager also shows under an empty later page, so a failed or empty page can be left
+        page = st.session_state.search_page
+        if page > 0 or st.session_state.search_has_more:
+            col_prev, col_next, _ = st.columns([1, 1, 8])
+            with col_prev:
+                prev_clicked = st.button("Previous page", disabled=page == 0, key="prev_page_btn")
+            with col_next:
+                next_clicked = st.button("Next page", disabled=not st.session_state.search_has_more, key="next_page_btn")
+            if prev_clicked or next_clicked:
+                with st.spinner("Searching..."):
+                    load_search_page(st.session_state.search_criteria, page + (1 if next_clicked else -1), user_token)
+                st.rerun()
+    else:
+        st.markdown(SEARCH_PROMPT_HTML, unsafe_allow_html=True)
 
-st.markdown("---")
+    st.markdown("---")
 
-st.markdown('<div class="section-header">Report Actions</div>', unsafe_allow_html=True)
+    st.markdown('<div class="section-header">Report Actions</div>', unsafe_allow_html=True)
 
-has_selection = st.session_state.selected_row_index is not None and st.session_state.search_results is not None and not st.session_state.search_results.empty
+    has_selection = st.session_state.selected_row_index is not None and st.session_state.search_results is not None and st.session_state.search_results.num_rows > 0
 
-btn_container, spacer = st.columns([3, 7])
+    # The selected report is loaded once, in the download column, and shared with the preview
+    report_view = None
+    # One stamp per minute for the PDF and its filename, so a minute's downloads share a cached build
+    generated_at = datetime.now().replace(second=0, microsecond=0)
+    if has_selection:
+        selected_client_id = st.session_state.search_results['koo_clientid'][st.session_state.selected_row_index].as_py()
+
+    col_preview, col_download, spacer = st.columns([1.5, 1.5, 7])
 
-with btn_container:
-    col_preview, col_download = st.columns(2)
-    
     with col_preview:
         st.markdown('<div class="preview-btn">', unsafe_allow_html=True)
         preview_clicked = st.button(
@@ -840,18 +1252,15 @@ with btn_container:
     with col_download:
         st.markdown('<div class="download-btn">', unsafe_allow_html=True)
         if has_selection:
-            selected_idx = st.session_state.selected_row_index
-            search_row = st.session_state.search_results.iloc[selected_idx]
-            client_id = search_row.get('koo_clientid', '')
-            report_df = load_report_data(client_id, user_token)
-            if not report_df.empty:
-                data_row = report_df.iloc[0]
-                pdf_buffer = generate_pdf(data_row)
-                client_name_for_file = safe_str(data_row.get('client_name', 'unknown')).replace(' ', '_')
+            data_row = load_report_row(selected_client_id, user_token)
+            if data_row:
+                report_view = build_report_view(data_row)
+                client_name_for_file = report_view.client_name.translate(REPORT_FILENAME_TRANSLATION)
                 st.download_button(
                     label="Download PDF",
-                    data=pdf_buffer,
-                    file_name=f"client_report_{client_name_for_file}_{datetime.now().strftime('%Y%m%d')}.pdf",
+                    # Deferred: ReportLab only runs when the button is actually clicked
+                    data=partial(build_pdf_bytes, report_view, generated_at),
+                    file_name=f"client_report_{client_name_for_file}_{generated_at.strftime('%Y%m%d')}.pdf",
                     mime="application/pdf",
                     type="secondary",
                     key="download_btn"
@@ -873,32 +1282,28 @@ with btn_container:
             )
         st.markdown('</div>', unsafe_allow_html=True)
 
-if preview_clicked and has_selection:
-    selected_idx = st.session_state.selected_row_index
-    search_row = st.session_state.search_results.iloc[selected_idx]
-    client_id = search_row.get('koo_clientid', '')
-    report_df = load_report_data(client_id, user_token)
-    if not report_df.empty:
-        new_data = report_df.iloc[0]
-        if st.session_state.report_data is not None:
-            st.session_state.report_data = None
+    if preview_clicked and has_selection:
+        if report_view is not None:
+            if st.session_state.report_data is not None:
+                st.session_state.report_data = None
+            else:
+                st.session_state.report_data = report_view
+                # Build the PDF while the preview renders so a following download is instant
+                submit_pdf_build(report_view, generated_at)
         else:
-            st.session_state.report_data = new_data
-    else:
-        st.error("No report data found for the selected client.")
+            st.error("No report data found for the selected client.")
 
-if st.session_state.report_data is not None:
-    st.markdown("---")
-    
-    data_row = st.session_state.report_data
-    client_name = safe_str(data_row.get('client_name', ''))
-    
-    st.markdown(f'<div class="section-header">Report Preview: {client_name}</div>', unsafe_allow_html=True)
-    
-    st.markdown("""
-    <div style="background-color: #161B22; padding: 10px; border-radius: 8px; text-align: center; margin-bottom: 10px; border: 1px solid #30363D;">
-        <span style="color: #8B949E;">Report Preview</span>
-    </div>
-    """, unsafe_allow_html=True)
-    
-    render_report_preview(data_row)
+    if st.session_state.report_data is not None:
+        st.markdown("---")
+        
+        report_view = st.session_state.report_data
+        
+        # The client name comes from the warehouse, so it is escaped before going into raw HTML
+        st.markdown(f'<div class="section-header">Report Preview: {html.escape(report_view.client_name)}</div>', unsafe_allow_html=True)
+        
+        st.markdown(REPORT_PREVIEW_BANNER_HTML, unsafe_allow_html=True)
+        
+        render_report_preview(report_view)
+
+
+render_results(user_token)